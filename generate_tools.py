@@ -1,46 +1,214 @@
 # -*- coding: utf-8 -*-
 # generate_tools.py
 import yaml
+import hashlib
+import io
 import json
 import re
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 
-# Import inflection at the top level
+# Prefer the libyaml-backed C loader; it requires PyYAML to be built against
+# libyaml (e.g. install libyaml-dev before pip install PyYAML).
 try:
-    import inflection
+    from yaml import CSafeLoader as _YamlLoader
 except ImportError:
-    print("inflection is not installed. Attempting to install...")
-    try:
-        import subprocess
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "inflection", "--break-system-packages", "--user"])
-        import inflection # Re-import after successful installation
-        print("inflection installed successfully.")
-    except Exception as e:
-        print("Error installing inflection: {}".format(e))
-        print("Please install inflection manually: pip install inflection")
-        sys.exit(1) # Exit if installation fails
-
-def openapi_type_to_zod_type(schema, components=None):
-    """Converts an OpenAPI schema object to a Zod type string."""
-    zod_types = []
+    from yaml import SafeLoader as _YamlLoader
 
-    # Handle $ref first
-    if '$ref' in schema:
-        ref_path = schema['$ref']
-        if ref_path.startswith('#/components/schemas/') and components:
-            schema_name = ref_path.replace('#/components/schemas/', '')
-            if schema_name in components.get('schemas', {}):
-                zod_types.append(openapi_type_to_zod_type(components['schemas'][schema_name], components))
-            else:
-                zod_types.append("z.any()") # Fallback for unresolvable references
-        else:
-            zod_types.append("z.any()") # Fallback for unresolvable references
+_WS_RE = re.compile(r'\s+')
+_NAME_CLEAN_RE = re.compile(r'[^a-zA-Z0-9_]')
+_HTTP_METHODS = frozenset({'get', 'post', 'put', 'delete', 'patch'})
+_LEAF_TYPES = frozenset({'string', 'integer', 'number', 'boolean', 'null'})
+
+# Object/array Zod types longer than this are emitted once as a shared const
+_SHARED_SCHEMA_MIN_LENGTH = 80
+
+# Zod strings for leaf schemas, keyed by every field that affects their output.
+# Specs reuse a small palette of these shapes, so most leaves are a dict hit.
+_SHAPE_CACHE = {}
+
+@lru_cache(maxsize=4096)
+def _camel_lower(name):
+    """Memoized lower-camelCase conversion; operationIds repeat across specs."""
+    import inflection # Imported lazily so that importing this module does not require it
+    return inflection.camelize(name, uppercase_first_letter=False)
+
+# Template for a single server.registerTool(...) block in the generated index.ts
+TOOL_CODE_TEMPLATE = """
+    server.registerTool(
+        "{tool_name}",
+        {{
+            title: "{summary}",
+            description: "{description}",
+            inputSchema: {input_schema_str},
+            // ⚠️ 不写 outputSchema，避免类型校验输出结构
+        }},
+        async ({{ {handler_params_destructured} }}, {{ ai_description, config }}) => {{
+            const apiBaseUrl = "https://api.mingdao.com"; // Base URL from OpenAPI spec
+            let endpoint = `{path}`;
+            {path_param_logic}
+            let fullUrl = `${{apiBaseUrl}}${{endpoint}}`;
+            {query_param_str}
+
+            const hapAppkey = config.hapAppkey;
+            const hapSign = config.hapSign;
+
+            if (!hapAppkey || !hapSign) {{
+                return {{
+                    content: [{{ type: "text", text: "Error: HAP-Appkey or HAP-Sign missing in server config." }}],
+                }};
+            }}
+
+            {request_body_logic}
+            const fetchOptions = {{
+                method: '{method_upper}',
+                headers: {{
+                    "Content-Type": "application/json",
+                    "HAP-Appkey": hapAppkey,
+                    "HAP-Sign": hapSign,
+                }},
+                {body_json_stringify}
+            }};
+
+            try {{
+                const response = await fetch(fullUrl, fetchOptions);
+                const result = await response.json();
+
+                if (!response.ok) {{
+                    return {{
+                        content: [{{ type: "text", text: JSON.stringify({{ error: result.error_msg || "Unknown error", statusCode: response.status }}) }}],
+                    }};
+                }}
+
+                return {{ content: [{{ type: "text", text: JSON.stringify(result) }}] }};
+
+            }} catch (error) {{
+                return {{
+                    content: [{{ type: "text", text: `Error calling external API: ${{error.message}}` }}],
+                }};
+            }}
+        }},
+    )"""
+
+_SCHEMA_REF_PREFIX = '#/components/schemas/'
+
+# Keywords whose values are literal data rather than schemas; never dereferenced
+_DATA_KEYWORDS = frozenset({'default', 'example', 'examples', 'enum', 'const'})
+
+# Keywords whose values map arbitrary names (which may be '$ref') to objects
+_NAMED_MAP_KEYWORDS = frozenset({'properties', 'patternProperties', 'content', 'headers',
+                                 'encoding', 'responses', 'links', 'callbacks'})
+
+def _dereference(spec):
+    """Replaces '$ref' nodes under the spec's paths with the component schemas they point to.
+
+    Each component is resolved once and shared by every node that referenced it;
+    these shared schemas are returned. A component that refers back to itself
+    while being resolved gets an {'x-zod-lazy': name} marker instead, and an
+    unresolvable reference becomes an empty schema. A '$ref' with sibling keys
+    keeps them, with the resolved schema put first in its oneOf list. Only
+    string-valued '$ref's are followed, and data keywords such as default and
+    example are left untouched.
+    """
+    schemas = spec.get('components', {}).get('schemas', {})
+    resolved = {}
+    in_progress = set()
+
+    def resolve(ref_path):
+        if ref_path in resolved:
+            return resolved[ref_path]
+        schema_name = ref_path[len(_SCHEMA_REF_PREFIX):] if ref_path.startswith(_SCHEMA_REF_PREFIX) else None
+        if schema_name not in schemas:
+            return {}
+        if schema_name in in_progress:
+            return {'x-zod-lazy': schema_name}
+        in_progress.add(schema_name)
+        target = walk(schemas[schema_name])
+        in_progress.discard(schema_name)
+        resolved[ref_path] = target
+        return target
+
+    def walk_map(mapping):
+        for key, value in mapping.items():
+            mapping[key] = walk(value)
+        return mapping
+
+    def walk(node):
+        if isinstance(node, dict):
+            is_ref = isinstance(node.get('$ref'), str)
+            if is_ref:
+                target = resolve(node['$ref'])
+                node = {key: value for key, value in node.items() if key != '$ref'}
+            for key, value in node.items():
+                if key in _DATA_KEYWORDS:
+                    continue
+                if key in _NAMED_MAP_KEYWORDS and isinstance(value, dict):
+                    node[key] = walk_map(value)
+                else:
+                    node[key] = walk(value)
+            if is_ref:
+                if not node:
+                    return target
+                node['oneOf'] = [target] + node.get('oneOf', [])
+        elif isinstance(node, list):
+            node[:] = [walk(item) for item in node]
+        return node
+
+    walk_map(spec.get('paths', {}))
+    return list(resolved.values())
+
+def _share_schema(zod_type, shared_schemas):
+    """Returns the const name for a long Zod type, registering it in shared_schemas.
+
+    Names are derived from the Zod string itself so that identical schemas from
+    different specs map to the same const.
+    """
+    if shared_schemas is None or len(zod_type) <= _SHARED_SCHEMA_MIN_LENGTH:
+        return zod_type
+    const_name = shared_schemas.get(zod_type)
+    if const_name is None:
+        const_name = "_schema_" + hashlib.sha1(zod_type.encode('utf-8')).hexdigest()[:10]
+        shared_schemas[zod_type] = const_name
+    return const_name
+
+def openapi_type_to_zod_type(schema, zod_cache=None, shared_schemas=None):
+    """Converts an OpenAPI schema object to a Zod type string.
+
+    Expects '$ref's to have been resolved by _dereference. zod_cache maps the id()
+    of each shared component schema to its Zod type string (None until converted)
+    so that each component is converted only once per spec. When shared_schemas
+    is given, long object/array types are replaced by const names registered there.
+    """
+    if zod_cache is None:
+        zod_cache = {}
+    schema_id = id(schema)
+    if zod_cache.get(schema_id) is not None:
+        return zod_cache[schema_id]
+
+    # Reference back into a component that is still being resolved
+    if 'x-zod-lazy' in schema:
+        return "z.lazy(() => z.any())"
+
+    # Leaf schemas (no nested schemas) are served from _SHAPE_CACHE
+    shape_key = None
+    schema_type = schema.get('type')
+    if isinstance(schema_type, str) and schema_type in _LEAF_TYPES and 'oneOf' not in schema:
+        default_value = schema.get('default')
+        if default_value is None or isinstance(default_value, (str, int, float)):
+            # repr() keeps defaults apart that compare equal but emit differently (True/1, 0.0/-0.0)
+            shape_key = (schema_type, schema.get('format') == 'date-time', 'default' in schema,
+                         repr(default_value))
+            if shape_key in _SHAPE_CACHE:
+                return _SHAPE_CACHE[shape_key]
+
+    zod_types = []
 
     # Handle oneOf
     if 'oneOf' in schema:
         for sub_schema in schema['oneOf']:
-            zod_types.append(openapi_type_to_zod_type(sub_schema, components))
+            zod_types.append(openapi_type_to_zod_type(sub_schema, zod_cache, shared_schemas))
 
     # Handle type
     if 'type' in schema:
@@ -55,35 +223,39 @@ def openapi_type_to_zod_type(schema, components=None):
             zod_types.append("z.boolean()")
         elif schema['type'] == 'array':
             items_schema = schema.get('items', {})
-            item_zod_type = openapi_type_to_zod_type(items_schema, components)
-            zod_types.append("z.array({})".format(item_zod_type))
+            item_zod_type = openapi_type_to_zod_type(items_schema, zod_cache, shared_schemas)
+            zod_types.append(_share_schema(f"z.array({item_zod_type})", shared_schemas))
         elif schema['type'] == 'object':
             properties = schema.get('properties', {})
+            required_set = frozenset(schema.get('required', ()))
             props_zod = []
             for prop_name, prop_schema in properties.items():
-                prop_zod = openapi_type_to_zod_type(prop_schema, components)
-                if prop_name in schema.get('required', []):
-                    props_zod.append("'{0}': {1}".format(prop_name, prop_zod))
+                prop_zod = openapi_type_to_zod_type(prop_schema, zod_cache, shared_schemas)
+                if prop_name in required_set:
+                    props_zod.append(f"'{prop_name}': {prop_zod}")
                 else:
-                    props_zod.append("'{0}': {1}.optional()".format(prop_name, prop_zod))
-            zod_types.append("z.object({{{}}})".format(', '.join(props_zod)))
+                    props_zod.append(f"'{prop_name}': {prop_zod}.optional()")
+            props_str = ', '.join(props_zod)
+            zod_types.append(_share_schema(f"z.object({{{props_str}}})", shared_schemas))
         elif schema['type'] == 'null':
             zod_types.append("z.null()")
         else:
             zod_types.append("z.any()") # Fallback for unknown types
     
-    # If no specific type was determined but it's not a ref or oneOf, default to any.
-    if not zod_types and not ('$ref' in schema or 'oneOf' in schema):
+    # If no specific type was determined but it's not a oneOf, default to any.
+    if not zod_types and 'oneOf' not in schema:
         zod_types.append("z.any()")
 
-    # Remove duplicates while preserving order
-    zod_types = list(dict.fromkeys(zod_types))
+    # Remove duplicates while preserving order (only possible with several candidates)
+    if len(zod_types) > 1:
+        zod_types = list(dict.fromkeys(zod_types))
 
     final_zod_type = ""
     if len(zod_types) == 1:
         final_zod_type = zod_types[0]
     elif len(zod_types) > 1:
-        final_zod_type = "z.union([{}])".format(', '.join(zod_types))
+        union_str = ', '.join(zod_types)
+        final_zod_type = f"z.union([{union_str}])"
     else:
         final_zod_type = "z.any()" # Should not happen if previous logic is correct
 
@@ -91,77 +263,92 @@ def openapi_type_to_zod_type(schema, components=None):
     if 'default' in schema:
         default_value = schema['default']
         if isinstance(default_value, bool):
-            final_zod_type += ".default({})".format('true' if default_value else 'false')
+            final_zod_type += ".default(true)" if default_value else ".default(false)"
         elif isinstance(default_value, str):
-            final_zod_type += ".default('{}')".format(default_value.replace("'", "\\'"))
+            escaped_default = default_value.replace("'", "\\'")
+            final_zod_type += f".default('{escaped_default}')"
         elif isinstance(default_value, (int, float)):
-            final_zod_type += ".default({})".format(default_value)
+            final_zod_type += f".default({default_value})"
         else:
             try:
                 json_string = json.dumps(default_value)
-                final_zod_type += ".default(JSON.parse('{}'))".format(json_string)
+                final_zod_type += f".default(JSON.parse('{json_string}'))"
             except TypeError:
                 print("Warning: Could not serialize default value {} to JSON for schema {}".format(default_value, schema))
                 pass
 
+    if schema_id in zod_cache:
+        zod_cache[schema_id] = final_zod_type
+    elif shape_key is not None:
+        _SHAPE_CACHE[shape_key] = final_zod_type
     return final_zod_type
 
 def generate_tool_code(file_path):
+    """Generates the registerTool code for every operation in an OpenAPI spec file.
+
+    Returns a (tool_code, shared_schemas) tuple, where shared_schemas maps each
+    Zod type referenced by const name in tool_code to that name.
+    """
     with open(file_path, 'r', encoding='utf-8') as f:
-        spec = yaml.safe_load(f)
+        spec = yaml.load(f, Loader=_YamlLoader)
 
-    tool_codes = []
-    components = spec.get('components', {})
+    tool_codes = io.StringIO()
+    # Component schemas are shared by every node that referenced them; convert each once
+    zod_cache = {id(component_schema): None for component_schema in _dereference(spec)}
+    shared_schemas = {}
 
     for path, path_item in spec.get('paths', {}).items():
         for method, operation in path_item.items():
-            if method not in ['get', 'post', 'put', 'delete', 'patch']:
+            if method not in _HTTP_METHODS:
                 continue
 
-            # Escape description and summary properly
-            summary = re.sub(r'\s+', ' ', operation.get('summary', '')).replace("'", "\\'")
-            description = re.sub(r'\s+', ' ', operation.get('description', summary)).replace("'", "\\'")
+            # Escape description and summary properly (each string is escaped exactly once)
+            summary = _WS_RE.sub(' ', operation.get('summary', '')).replace("'", "\\'")
+            if 'description' in operation:
+                description = _WS_RE.sub(' ', operation['description']).replace("'", "\\'")
+            else:
+                description = summary
             
             # Initialize desc_example with a default value
-            desc_example = summary.replace("'", "\\'")
+            desc_example = summary
 
             # Generate a more descriptive tool name
             tool_name_base = operation.get('operationId') or operation.get('summary')
             
             clean_tool_name = ""
             if tool_name_base:
-                clean_tool_name = re.sub(r'[^a-zA-Z0-9_]', ' ', tool_name_base).strip()
+                clean_tool_name = _NAME_CLEAN_RE.sub(' ', tool_name_base).strip()
             
             if clean_tool_name:
-                tool_name = inflection.camelize(clean_tool_name, uppercase_first_letter=False)
+                tool_name = _camel_lower(clean_tool_name)
             else:
                 # Fallback if no operationId or summary, or if it's empty after cleanup
                 fallback_name = "{}_{}".format(method, os.path.basename(file_path).split('.')[0].replace('-', '_'))
-                tool_name = inflection.camelize(fallback_name, uppercase_first_letter=False)
+                tool_name = _camel_lower(fallback_name)
                 print("Warning: Fallback tool_name used for {}: {}".format(file_path, tool_name))
 
             # Ensure tool_name is not empty (this check might be redundant now but good for safety)
             if not tool_name:
                 tool_name = "{}_fallback_{}".format(method, os.path.basename(file_path).split('.')[0].replace('-', '_'))
-                tool_name = inflection.camelize(tool_name, uppercase_first_letter=False)
+                tool_name = _camel_lower(tool_name)
                 print("Warning: Double fallback tool_name used for {}: {}".format(file_path, tool_name))
 
             # Input Schema
             input_properties = {}
-            input_required = []
+            input_required = set()
 
             # Path parameters
             for param in operation.get('parameters', []):
                 if param.get('in') == 'path':
                     param_name = param['name']
-                    input_properties[param_name] = openapi_type_to_zod_type(param.get('schema', {}), components)
+                    input_properties[param_name] = openapi_type_to_zod_type(param.get('schema', {}), zod_cache, shared_schemas)
                     if param.get('required'):
-                        input_required.append(param_name)
+                        input_required.add(param_name)
                 elif param.get('in') == 'query':
                     param_name = param['name']
-                    input_properties[param_name] = openapi_type_to_zod_type(param.get('schema', {}), components)
+                    input_properties[param_name] = openapi_type_to_zod_type(param.get('schema', {}), zod_cache, shared_schemas)
                     if param.get('required'):
-                        input_required.append(param_name)
+                        input_required.add(param_name)
 
             # Request Body
             request_body = operation.get('requestBody')
@@ -171,133 +358,58 @@ def generate_tool_code(file_path):
                 schema = json_content.get('schema', {})
                 if schema:
                     body_properties = schema.get('properties', {})
+                    required_set = frozenset(schema.get('required', ()))
                     for prop_name, prop_schema in body_properties.items():
                         # Special handling for '{inputs}' parameter
                         if prop_name == '{inputs}':
-                            input_properties['inputs'] = openapi_type_to_zod_type(prop_schema, components)
-                            if prop_name in schema.get('required', []):
-                                input_required.append('inputs') # Add 'inputs' as required
+                            input_properties['inputs'] = openapi_type_to_zod_type(prop_schema, zod_cache, shared_schemas)
+                            if prop_name in required_set:
+                                input_required.add('inputs') # Add 'inputs' as required
                         else:
-                            input_properties[prop_name] = openapi_type_to_zod_type(prop_schema, components)
-                            if prop_name in schema.get('required', []):
-                                input_required.append(prop_name)
+                            input_properties[prop_name] = openapi_type_to_zod_type(prop_schema, zod_cache, shared_schemas)
+                            if prop_name in required_set:
+                                input_required.add(prop_name)
             
             input_properties['ai_description'] = "z.string().describe('{}')".format(desc_example)
-            input_required.append('ai_description')
+            input_required.add('ai_description')
 
 
-        # Construct input schema string
-        input_schema_parts = []
-        for prop_name, zod_type_str in input_properties.items():
-            # Ensure the key in the Zod object is just 'inputs', not '{inputs}'
-            if prop_name == '{inputs}': 
-                input_schema_parts.append("'inputs': {}".format(zod_type_str))
-            elif prop_name in input_required:
-                input_schema_parts.append("'{0}': {1}".format(prop_name, zod_type_str))
-            else:
-                input_schema_parts.append("'{0}': {1}.optional()".format(prop_name, zod_type_str))
-        
-        input_schema_str = "z.object({{{}}})".format(', '.join(input_schema_parts))
-        
-        # Collect handler parameters, excluding ai_description from direct destructuring
-        handler_params_list = []
-        for p_name_key in input_properties.keys(): # Iterate over actual keys in input_properties
-            p_name_var = p_name_key # Default to using the key as the variable name
-            if p_name_key == '{inputs}': # If the key is '{inputs}', the variable name should be 'inputs'
-                p_name_var = 'inputs'
+            # Construct input schema string ('{inputs}' was already stored as 'inputs' above)
+            input_schema_parts = []
+            for prop_name, zod_type_str in input_properties.items():
+                if prop_name in input_required:
+                    input_schema_parts.append(f"'{prop_name}': {zod_type_str}")
+                else:
+                    input_schema_parts.append(f"'{prop_name}': {zod_type_str}.optional()")
             
-            if p_name_var != 'ai_description':
-                handler_params_list.append(p_name_var.strip("'")) # Ensure variable names are clean
-        
-        handler_params_destructured = ", ".join(handler_params_list)
-
-        # Inside the handler's console.log (for debugging)
-        log_params = ", ".join([p.strip("'") if p != '{inputs}' else "inputs" for p in input_properties.keys() if p != 'ai_description'])
-
-
-        tool_code = """
-    server.registerTool(
-        "{tool_name}",
-        {{
-            title: "{summary}",
-            description: "{description}",
-            inputSchema: {input_schema_str},
-            // ⚠️ 不写 outputSchema，避免类型校验输出结构
-        }},
-        async ({{ {handler_params_destructured} }}, {{ ai_description, config }}) => {{
-            const apiBaseUrl = "https://api.mingdao.com"; // Base URL from OpenAPI spec
-            let endpoint = `{path}`;
-            {path_param_logic}
-            let fullUrl = `${{apiBaseUrl}}${{endpoint}}`;
-            {query_param_str}
-
-            const hapAppkey = config.hapAppkey;
-            const hapSign = config.hapSign;
-
-            if (!hapAppkey || !hapSign) {{
-                return {{
-                    content: [{{ type: "text", text: "Error: HAP-Appkey or HAP-Sign missing in server config." }}],
-                }};
-            }}
-
-            {request_body_logic}
-            const fetchOptions = {{
-                method: '{method_upper}',
-                headers: {{
-                    "Content-Type": "application/json",
-                    "HAP-Appkey": hapAppkey,
-                    "HAP-Sign": hapSign,
-                }},
-                {body_json_stringify}
-            }};
-
-            try {{
-                const response = await fetch(fullUrl, fetchOptions);
-                const result = await response.json();
-
-                if (!response.ok) {{
-                    return {{
-                        content: [{{ type: "text", text: JSON.stringify({{ error: result.error_msg || "Unknown error", statusCode: response.status }}) }}],
-                    }};
-                }}
-
-                return {{ content: [{{ type: "text", text: JSON.stringify(result) }}] }};
-
-            }} catch (error) {{
-                return {{
-                    content: [{{ type: "text", text: `Error calling external API: ${{error.message}}` }}],
-                }};
-            }}
-        }},
-    )""".format(
-            tool_name=tool_name,
-            summary=summary,
-            description=description,
-            input_schema_str=input_schema_str,
-            handler_params_destructured=handler_params_destructured,
-            path=path,
-            path_param_logic=path_param_logic,
-            query_param_str=query_param_str,
-            request_body_logic=request_body_logic,
-            method_upper=method.upper(),
-            body_json_stringify=( "body: JSON.stringify(requestBody)," if (has_request_body and method.upper() in ['POST', 'PUT', 'PATCH']) else "" )
-        )
-        tool_codes.append(tool_code)
-    return "\n".join(tool_codes)
-
-def main():
-    api_docs_dir = 'api_docs'
-    output_file_path = 'hap-mcp/src/index.ts'
-    generated_tools = []
-
-    # Check if PyYAML is installed
-    try:
-        import yaml
-    except ImportError:
-        print("PyYAML is not installed. Please install it using 'pip install PyYAML'")
-        return
-
-    # Check if inflection is installed
+            input_schema_parts_str = ', '.join(input_schema_parts)
+            input_schema_str = f"z.object({{{input_schema_parts_str}}})"
+            
+            # Collect handler parameters, excluding ai_description from direct destructuring
+            handler_params_list = [p_name for p_name in input_properties if p_name != 'ai_description']
+            handler_params_destructured = ", ".join(handler_params_list)
+
+
+            tool_code = TOOL_CODE_TEMPLATE.format(
+                tool_name=tool_name,
+                summary=summary,
+                description=description,
+                input_schema_str=input_schema_str,
+                handler_params_destructured=handler_params_destructured,
+                path=path,
+                path_param_logic=path_param_logic,
+                query_param_str=query_param_str,
+                request_body_logic=request_body_logic,
+                method_upper=method.upper(),
+                body_json_stringify=( "body: JSON.stringify(requestBody)," if (has_request_body and method.upper() in ['POST', 'PUT', 'PATCH']) else "" )
+            )
+            if tool_codes.tell():
+                tool_codes.write("\n")
+            tool_codes.write(tool_code)
+    return tool_codes.getvalue(), shared_schemas
+
+def _ensure_inflection():
+    """Installs inflection with pip if it is missing; exits if that fails."""
     try:
         import inflection
     except ImportError:
@@ -305,18 +417,35 @@ def main():
         try:
             import subprocess
             subprocess.check_call([sys.executable, "-m", "pip", "install", "inflection", "--break-system-packages", "--user"])
-            import inflection
+            import inflection # Re-import after successful installation
             print("inflection installed successfully.")
         except Exception as e:
             print("Error installing inflection: {}".format(e))
             print("Please install inflection manually: pip install inflection")
             sys.exit(1) # Exit if installation fails
 
-    for filename in os.listdir(api_docs_dir):
-        if filename.endswith('.yaml'):
-            full_path = os.path.join(api_docs_dir, filename)
-            print("Generating tool code for {}...".format(filename))
-            generated_tools.append(generate_tool_code(full_path))
+def main():
+    api_docs_dir = 'api_docs'
+    output_file_path = 'hap-mcp/src/index.ts'
+
+    _ensure_inflection()
+
+    paths = []
+    with os.scandir(api_docs_dir) as entries:
+        for entry in entries:
+            if entry.name.endswith('.yaml') and entry.is_file():
+                print("Generating tool code for {}...".format(entry.name))
+                paths.append(entry.path)
+
+    # Each spec is independent, so generate them in parallel; map() keeps the input order
+    with ProcessPoolExecutor() as executor:
+        results = list(executor.map(generate_tool_code, paths))
+
+    generated_tools = []
+    shared_schemas = {}
+    for tool_code, file_shared_schemas in results:
+        generated_tools.append(tool_code)
+        shared_schemas.update(file_shared_schemas)
 
     # Read the original index.ts content
     with open(output_file_path, 'r', encoding='utf-8') as f:
@@ -330,16 +459,17 @@ def main():
         print("Error: Could not find insertion marker in index.ts.")
         return
 
-    # Add proper indentation and comments for the generated tools
-    indented_generated_tools = ""
-    if generated_tools:
-        indented_generated_tools = "\n  // --- Generated API Tools ---\n" + "\n".join(generated_tools) + "\n  // --- End Generated API Tools ---\n\n"
-
-    final_content = original_content[:insert_index] + indented_generated_tools + original_content[insert_index:]
-
-    # Write the updated content back to index.ts
+    # Write the updated content back to index.ts, splicing the generated tools
+    # (with marker comments) in at the insertion point without building the whole file in memory
     with open(output_file_path, 'w', encoding='utf-8') as f:
-        f.write(final_content)
+        f.write(original_content[:insert_index])
+        if generated_tools:
+            f.write("\n  // --- Generated API Tools ---\n")
+            for zod_type, const_name in shared_schemas.items():
+                f.write(f"    const {const_name} = {zod_type};\n")
+            f.write("\n".join(generated_tools))
+            f.write("\n  // --- End Generated API Tools ---\n\n")
+        f.write(original_content[insert_index:])
 
     print("Generated tool code and updated hap-mcp/src/index.ts")
 